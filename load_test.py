@@ -0,0 +1,178 @@
+"""
+load_test.py - รันบอทขุดจริง (mine_web.py) กับ sim_node.py แล้ววัดผล
+ตัวอย่าง: python load_test.py --accounts 1000 --duration 600 --cooldown 60
+
+รายงาน:
+- mines/hour (รวม และต่อ ID เทียบกับค่าสูงสุดตาม cooldown)
+- queue wait = เวลาที่ mine ช้ากว่าตอน cooldown หมด (รอ Semaphore + PoW + sign)
+- CPU ของ Python (threads) และ subprocess (PoW/sign.js) ต่อ ID
+- latency ของ /api/status
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+import mine_web
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+
+def make_wif():
+    """สุ่ม private key (legacy WIF) ให้ sign.js ใช้เซ็นได้"""
+    raw = b'\x80' + os.urandom(32)
+    raw += hashlib.sha256(hashlib.sha256(raw).digest()).digest()[:4]
+    n = int.from_bytes(raw, 'big')
+    out = ''
+    while n:
+        n, r = divmod(n, 58)
+        out = BASE58_ALPHABET[r] + out
+    return out
+
+
+def account_name(i):
+    """ชื่อ account ที่ถูกต้องตาม EOSIO (a-z เท่านั้น, ไม่เกิน 12 ตัว)"""
+    suffix = ''
+    for _ in range(6):
+        suffix = 'abcdefghijklmnopqrstuvwxyz'[i % 26] + suffix
+        i //= 26
+    return 'ltm' + suffix
+
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def wait_for_node(url, timeout=15):
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        try:
+            requests.get(f"{url}/sim/stats", timeout=1).raise_for_status()
+            return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test บอทขุดกับ sim_node.py")
+    parser.add_argument('--accounts', type=int, default=1000, help="จำนวน ID ที่ขุด (ไม่รวม CPU Helper)")
+    parser.add_argument('--duration', type=int, default=600, help="วินาที")
+    parser.add_argument('--cooldown', type=int, default=60)
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--latency-ms', type=int, default=30)
+    parser.add_argument('--jitter-ms', type=int, default=10)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--stagger', type=int, default=0)
+    parser.add_argument('--tx-cpu-us', type=int, default=400)
+    parser.add_argument('--cpu-max-us', type=int, default=5000000)
+    parser.add_argument('--cpu-window', type=int, default=86400)
+    parser.add_argument('--status-interval', type=int, default=5, help="วินาทีระหว่างการเรียก /api/status")
+    parser.add_argument('--json', help="บันทึกรายงานเป็นไฟล์ JSON")
+    args = parser.parse_args()
+
+    # do_work / push_transaction ใช้ path แบบ relative
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    url = f"http://127.0.0.1:{args.port}"
+    node = subprocess.Popen([
+        sys.executable, 'sim_node.py', '--port', str(args.port),
+        '--cooldown', str(args.cooldown), '--latency-ms', str(args.latency_ms),
+        '--jitter-ms', str(args.jitter_ms), '--error-rate', str(args.error_rate),
+        '--stagger', str(args.stagger), '--tx-cpu-us', str(args.tx_cpu_us),
+        '--cpu-max-us', str(args.cpu_max_us), '--cpu-window', str(args.cpu_window),
+    ])
+    try:
+        if not wait_for_node(url):
+            print("ERROR: sim_node.py ไม่ตอบสนอง")
+            return 1
+
+        # ชี้บอทไปที่ sim แทน RPC จริง
+        mine_web.RPC_ENDPOINTS[:] = [url]
+        mine_web.current_rpc_index = 0
+        mine_web.accounts_data.append({'name': 'ltpayer', 'key': make_wif(), 'cooldown': args.cooldown})
+        for i in range(args.accounts):
+            mine_web.accounts_data.append({'name': account_name(i), 'key': make_wif(), 'cooldown': args.cooldown})
+        mine_web.first_account_data = mine_web.accounts_data[0]
+        mine_web.payer_governor.start()
+
+        client = mine_web.app.test_client()
+        wall_start = time.time()
+        cpu_start = time.process_time()
+        children_start = os.times()
+
+        client.post('/api/start')
+        start_cost = time.time() - wall_start
+        print(f"/api/start ใช้เวลา {start_cost:.1f}s สำหรับ {args.accounts} ID")
+
+        status_latency = []
+        while time.time() - wall_start < args.duration:
+            time.sleep(args.status_interval)
+            t0 = time.time()
+            client.get('/api/status')
+            status_latency.append(time.time() - t0)
+            mines = requests.get(f"{url}/sim/stats", timeout=5).json()['mines']
+            print(f"[{int(time.time() - wall_start)}s] mines={mines} /api/status={status_latency[-1] * 1000:.0f}ms")
+
+        client.post('/api/stop')
+        elapsed = time.time() - wall_start
+        cpu_python = time.process_time() - cpu_start
+        children_end = os.times()
+        cpu_children = (children_end.children_user - children_start.children_user) + \
+                       (children_end.children_system - children_start.children_system)
+        sim = requests.get(f"{url}/sim/stats", timeout=5).json()
+    finally:
+        node.terminate()
+        node.wait()
+
+    hours = elapsed / 3600
+    lateness = sim['lateness']
+    status_latency.sort()
+    report = {
+        "accounts": args.accounts,
+        "duration_s": round(elapsed, 1),
+        "mines": sim['mines'],
+        "mines_per_hour": round(sim['mines'] / hours, 1),
+        "mines_per_hour_per_account": round(sim['mines'] / hours / args.accounts, 3),
+        "max_mines_per_hour_per_account": round(3600 / args.cooldown, 3),
+        "accounts_never_mined": args.accounts - len(sim['mines_by_account']),
+        "queue_wait_s": {
+            "avg": round(sum(lateness) / len(lateness), 2) if lateness else 0,
+            "p50": round(percentile(lateness, 50), 2),
+            "p95": round(percentile(lateness, 95), 2),
+            "max": round(lateness[-1], 2) if lateness else 0,
+        },
+        "rejects": sim['rejects'],
+        "injected_errors": sim['injected_errors'],
+        "cpu_s": {
+            "python": round(cpu_python, 2),
+            "subprocess": round(cpu_children, 2),
+            "per_account_hour": round((cpu_python + cpu_children) / args.accounts / hours, 3),
+            "per_mine": round((cpu_python + cpu_children) / sim['mines'], 3) if sim['mines'] else None,
+        },
+        "api_start_s": round(start_cost, 2),
+        "api_status_ms": {
+            "p50": round(percentile(status_latency, 50) * 1000, 1),
+            "max": round(status_latency[-1] * 1000, 1) if status_latency else 0,
+        },
+        "payer": mine_web.payer_governor.snapshot(),
+    }
+
+    print("\n" + "=" * 50)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
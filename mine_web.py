@@ -13,8 +13,12 @@ import json
 import threading
 import time
 import os
+import sys
+import math
 import subprocess
 import requests
+import heapq
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from collections import deque
 
@@ -31,6 +35,18 @@ current_rpc_index = 0
 FEDERATION_ACCOUNT = 'm.federation'
 DEFAULT_LAND_ID = '1099512960590'
 
+# Admission control ตาม CPU/NET ของ CPU Helper (payer)
+PAYER_REFRESH_INTERVAL = 15      # วินาที - ดึง get_account ของ payer ทุกๆ
+PAYER_STALE_AFTER = 120          # ข้อมูลเก่ากว่านี้ = ไม่รู้สถานะ (ปล่อยผ่าน)
+PAYER_COST_SAMPLES = 20          # จำนวน tx ล่าสุดที่ใช้ประเมิน cost
+PAYER_DEFAULT_CPU_US = 1000      # cost เริ่มต้นก่อนมี trace จริง
+PAYER_DEFAULT_NET_BYTES = 300
+PAYER_REGEN_WINDOW = 86400       # CPU/NET ของ EOSIO ฟื้นจาก 0 จนเต็ม max ภายใน 24 ชม.
+
+# Tracing / Profiling (เปิด trace ตอนเริ่มด้วย MINER_TRACE=1 หรือ /api/trace/start)
+TRACE_MAX_EVENTS = 50000         # span ล่าสุดที่เก็บไว้
+PROFILE_MAX_SECONDS = 60         # จำกัดเวลา /api/profile
+
 # --- GLOBALS ---
 first_account_data = None
 miners = {}
@@ -48,11 +64,196 @@ def switch_rpc():
     current_rpc_index = (current_rpc_index + 1) % len(RPC_ENDPOINTS)
 
 
+def rpc_post(path, payload, timeout=5):
+    """POST ไปที่ RPC ปัจจุบัน - ถ้าล้มเหลวสลับ endpoint แล้วลองใหม่"""
+    with tracer.span("rpc." + path.rsplit('/', 1)[-1]):
+        return _rpc_post(path, payload, timeout)
+
+
+def _rpc_post(path, payload, timeout):
+    for _ in range(len(RPC_ENDPOINTS)):
+        try:
+            res = requests.post(f"{get_rpc_url()}{path}", json=payload, timeout=timeout)
+            res.raise_for_status()
+            return res.json()
+        except:
+            switch_rpc()
+            time.sleep(0.2)
+    return {}
+
+
 def add_log(account, msg, level="info"):
     timestamp = datetime.now().strftime("%H:%M:%S")
     logs.appendleft({"time": timestamp, "account": account, "msg": msg, "level": level})
 
 
+class Tracer:
+    """
+    บันทึกเวลาแต่ละช่วงของ mine cycle แยกตาม thread (ชื่อ thread = ชื่อ account)
+    export เป็น Chrome trace (chrome://tracing, Perfetto) หรือ speedscope
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.events = deque(maxlen=TRACE_MAX_EVENTS)
+        self.origin = time.perf_counter()
+
+    def start(self):
+        with self.lock:
+            self.events.clear()
+            self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def add(self, name, start, duration, args=None):
+        """เพิ่ม span ที่วัดเอง - start เป็นค่าจาก time.perf_counter()"""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self.lock:
+            self.events.append((name, thread.name, thread.ident, start, duration, args or {}))
+
+    @contextmanager
+    def span(self, name):
+        """with tracer.span("pow") as args: ... - ใส่ข้อมูลเพิ่มใน args ได้"""
+        args = {}
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, start, time.perf_counter() - start, args)
+
+    def snapshot_events(self):
+        with self.lock:
+            return list(self.events)
+
+    def export_chrome(self):
+        pid = os.getpid()
+        trace_events = []
+        thread_names = {}
+        for name, thread_name, tid, start, duration, args in self.snapshot_events():
+            thread_names[tid] = thread_name
+            trace_events.append({
+                "name": name, "cat": "mine", "ph": "X", "pid": pid, "tid": tid,
+                "ts": round((start - self.origin) * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "args": args
+            })
+        for tid, thread_name in thread_names.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_speedscope(self):
+        frames = []
+        frame_index = {}
+        by_thread = {}
+        for event in self.snapshot_events():
+            by_thread.setdefault((event[1], event[2]), []).append(event)
+
+        profiles = []
+        for (thread_name, _), spans in by_thread.items():
+            # span ซ้อนกันใน thread เดียว - เรียงตามเวลาเริ่ม (ตัวนอกก่อน) แล้วเปิด/ปิดด้วย stack
+            spans.sort(key=lambda e: (e[3], -e[4]))
+            events = []
+            stack = []
+            for name, _, _, start, duration, _ in spans:
+                if name not in frame_index:
+                    frame_index[name] = len(frames)
+                    frames.append({"name": name})
+                at = (start - self.origin) * 1e6
+                while stack and stack[-1][1] <= at:
+                    frame, end = stack.pop()
+                    events.append({"type": "C", "frame": frame, "at": end})
+                end = at + duration * 1e6
+                if stack:
+                    end = min(end, stack[-1][1])
+                events.append({"type": "O", "frame": frame_index[name], "at": at})
+                stack.append((frame_index[name], end))
+            while stack:
+                frame, end = stack.pop()
+                events.append({"type": "C", "frame": frame, "at": end})
+            profiles.append({
+                "type": "evented", "name": thread_name, "unit": "microseconds",
+                "startValue": events[0]["at"], "endValue": events[-1]["at"],
+                "events": events
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": "alien-miner trace",
+            "exporter": "mine_web.py"
+        }
+
+
+tracer = Tracer(enabled=os.environ.get('MINER_TRACE') == '1')
+profile_lock = threading.Lock()  # profile ได้ทีละครั้ง
+
+
+def sample_profile(seconds, interval):
+    """
+    Sampling profiler แบบ wall-clock ของ miner threads (ไม่ต้อง restart)
+    เก็บ stack ของทุก WebMiner ทุกๆ interval วินาที คืนเป็น speedscope (sampled)
+    น้ำหนักของแต่ละ sample = เวลาจริงจนถึง sample ถัดไป (การเดิน stack 1000+ threads ใช้เวลาด้วย)
+    """
+    frames = []
+    frame_index = {}
+    stack_weights = {}
+    sample_count = 0
+    start_time = time.perf_counter()
+    end_time = start_time + seconds
+    while True:
+        sample_time = time.perf_counter()
+        if sample_time >= end_time:
+            break
+        sample_stacks = []
+        targets = {m.ident for m in list(miners.values()) if m.ident}
+        for ident, frame in sys._current_frames().items():
+            if ident not in targets:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                stack.append(frame_index[key])
+                frame = frame.f_back
+            stack.reverse()
+            sample_stacks.append(tuple(stack))
+        sample_count += 1
+        time.sleep(max(0, min(interval, end_time - time.perf_counter())))
+        weight_ms = (min(time.perf_counter(), end_time) - sample_time) * 1000
+        for stack in sample_stacks:
+            stack_weights[stack] = stack_weights.get(stack, 0) + weight_ms
+
+    duration_ms = (time.perf_counter() - start_time) * 1000
+    weights = list(stack_weights.values())
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": f"miner threads ({sample_count} samples in {duration_ms / 1000:.1f}s, target {interval * 1000:g}ms)",
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": [list(stack) for stack in stack_weights],
+            "weights": weights
+        }],
+        "name": "alien-miner profile",
+        "exporter": "mine_web.py"
+    }
+
+
 def find_bounty_in_traces(traces):
     for t in traces:
         if t.get('act', {}).get('name') == 'logmint':
@@ -66,9 +267,201 @@ def find_bounty_in_traces(traces):
     return None
 
 
+def find_cost_in_result(result):
+    """คืน (cpu_us, net_bytes) ที่ tx ใช้จริง - ใช้ receipt ก่อน fallback เป็นผลรวม elapsed ของ traces"""
+    cpu = result.get('cpu_usage_us')
+    net = result.get('net_usage_words')
+    net = net * 8 if net else None
+    if not cpu:
+        def sum_elapsed(traces):
+            total = 0
+            for t in traces:
+                total += t.get('elapsed', 0) or 0
+                total += sum_elapsed(t.get('inline_traces', []))
+            return total
+        cpu = sum_elapsed(result.get('traces', [])) or None
+    return cpu, net
+
+
+def is_resource_error(err):
+    msg = str(err).lower()
+    return any(s in msg for s in ('billed cpu time', 'cpu usage', 'net usage', 'tx_cpu_usage_exceeded', 'tx_net_usage_exceeded'))
+
+
+class PayerGovernor:
+    """
+    ควบคุมจำนวน tx ที่ส่งตาม CPU/NET ที่เหลือของ CPU Helper
+    - ดึง get_account ของ payer เป็นระยะ
+    - ประเมิน cost ต่อ tx จาก trace ล่าสุด
+    - token bucket: ยอด available เติมต่อเนื่องตามอัตราฟื้นตัว (max / 24 ชม.) ระหว่างรอบ refresh
+      และเมื่อ refresh จะตั้งตามที่ chain รายงาน ลบด้วย tx ที่ปล่อยไปแล้วแต่ยังไม่ถูกหักบน chain (reserved)
+    - ID ที่ยังไม่ได้สิทธิ์จะรอในคิว เรียงตามเวลาที่ cooldown หมด (หมดก่อนได้ก่อน)
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.queue = []  # heap ของ (ready_at, seq, account)
+        self.seq = 0
+        self.cpu_available = None
+        self.net_available = None
+        self.cpu_max = None
+        self.net_max = None
+        self.cpu_reserved = 0
+        self.net_reserved = 0
+        self.exhausted = False
+        self.last_refresh = 0
+        self.last_regen = time.time()
+        self.cpu_samples = deque(maxlen=PAYER_COST_SAMPLES)
+        self.net_samples = deque(maxlen=PAYER_COST_SAMPLES)
+        self.refresh_now = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._poll_loop, name="payer-governor", daemon=True)
+            self.thread.start()
+
+    def _poll_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                add_log("PAYER", f"get_account Error: {e}", "error")
+            self.refresh_now.wait(PAYER_REFRESH_INTERVAL)
+            self.refresh_now.clear()
+
+    def refresh(self):
+        if not first_account_data:
+            return
+        res = rpc_post("/v1/chain/get_account", {"account_name": first_account_data['name']})
+        cpu = res.get('cpu_limit')
+        net = res.get('net_limit')
+        if not cpu or not net:
+            return
+        with self.cond:
+            # tx ที่ปล่อยไปแล้วแต่ยังไม่ push (รอ Semaphore / PoW / sign) chain ยังไม่นับ - หักเอง
+            self.cpu_available = max(0, int(cpu.get('available', 0))) - self.cpu_reserved
+            self.net_available = max(0, int(net.get('available', 0))) - self.net_reserved
+            self.cpu_max = int(cpu.get('max', 0))
+            self.net_max = int(net.get('max', 0))
+            self.exhausted = False
+            self.last_refresh = self.last_regen = time.time()
+            self.cond.notify_all()
+
+    def _regenerate(self):
+        """เติม available ตามอัตราที่ payer ฟื้นตัว - ปล่อย tx ทีละน้อยแทนที่จะปล่อยเป็นชุดทุกรอบ refresh"""
+        now = time.time()
+        if self.cpu_available is not None and self.cpu_max:
+            elapsed = now - self.last_regen
+            self.cpu_available = min(self.cpu_available + self.cpu_max * elapsed / PAYER_REGEN_WINDOW,
+                                     self.cpu_max - self.cpu_reserved)
+            self.net_available = min(self.net_available + self.net_max * elapsed / PAYER_REGEN_WINDOW,
+                                     self.net_max - self.net_reserved)
+        self.last_regen = now
+
+    def estimated_cost(self):
+        """cost ต่อ tx = ค่าสูงสุดของ tx ล่าสุด (เผื่อไว้ก่อน)"""
+        cpu = max(self.cpu_samples) if self.cpu_samples else PAYER_DEFAULT_CPU_US
+        net = max(self.net_samples) if self.net_samples else PAYER_DEFAULT_NET_BYTES
+        return cpu, net
+
+    def _known(self):
+        return self.cpu_available is not None and time.time() - self.last_refresh < PAYER_STALE_AFTER
+
+    def _has_budget(self):
+        if not self._known():
+            return True  # ไม่รู้สถานะ payer - ปล่อยผ่านเหมือนเดิม
+        if self.exhausted:
+            return False
+        self._regenerate()
+        cpu, net = self.estimated_cost()
+        return self.cpu_available >= cpu and self.net_available >= net
+
+    def admit(self, miner, ready_at):
+        """
+        รอจนได้สิทธิ์ส่ง tx - คืน ticket (CPU/NET ที่จองไว้) หรือ None ถ้า miner ถูกหยุดระหว่างรอ
+        ต้องคืน ticket ด้วย release() เสมอ ไม่ว่า push สำเร็จหรือไม่
+        """
+        if not first_account_data:
+            return {"cpu": 0, "net": 0, "released": True}
+        with self.cond:
+            self.seq += 1
+            entry = (ready_at, self.seq, miner.account_name)
+            heapq.heappush(self.queue, entry)
+            try:
+                while miner.running:
+                    if self.queue[0] == entry and self._has_budget():
+                        cpu, net = self.estimated_cost()
+                        if self._known():
+                            self.cpu_available -= cpu
+                            self.net_available -= net
+                        self.cpu_reserved += cpu
+                        self.net_reserved += net
+                        return {"cpu": cpu, "net": net, "released": False}
+                    miner.status = f"รอ CPU Payer (คิว {len(self.queue)})"
+                    self.cond.wait(1)
+                return None
+            finally:
+                self.queue.remove(entry)
+                heapq.heapify(self.queue)
+                self.cond.notify_all()
+
+    def release(self, ticket, consumed=False):
+        """คืนยอดจอง - consumed=True เมื่อ tx เข้า chain แล้ว (refresh รอบหน้าจะเห็นยอดที่ถูกหักจริง)"""
+        with self.cond:
+            if ticket["released"]:
+                return
+            ticket["released"] = True
+            self.cpu_reserved -= ticket["cpu"]
+            self.net_reserved -= ticket["net"]
+            if not consumed and self.cpu_available is not None:
+                # tx ไม่ถูกส่ง/ล้ม - chain ไม่คิด CPU คืนยอดให้คิว
+                self.cpu_available += ticket["cpu"]
+                self.net_available += ticket["net"]
+            self.cond.notify_all()
+
+    def record(self, result, ticket):
+        cpu, net = find_cost_in_result(result)
+        with self.cond:
+            if cpu:
+                self.cpu_samples.append(cpu)
+            if net:
+                self.net_samples.append(net)
+        self.release(ticket, consumed=True)
+
+    def report_failure(self, err, ticket):
+        """tx ล้ม - คืนยอดจอง ถ้าล้มเพราะ CPU/NET หมด หยุดปล่อยคิวจนกว่าจะดึงสถานะใหม่"""
+        if is_resource_error(err):
+            with self.cond:
+                self.exhausted = True
+            self.refresh_now.set()
+        self.release(ticket)
+
+    def snapshot(self):
+        with self.cond:
+            cpu, net = self.estimated_cost()
+            per_hour = None
+            if self.cpu_max:
+                per_hour = int(self.cpu_max / cpu * 3600 / PAYER_REGEN_WINDOW)
+            return {
+                "cpu_available": None if self.cpu_available is None else int(self.cpu_available),
+                "cpu_max": self.cpu_max,
+                "cpu_reserved": self.cpu_reserved,
+                "net_available": None if self.net_available is None else int(self.net_available),
+                "net_max": self.net_max,
+                "cpu_per_tx": cpu,
+                "net_per_tx": net,
+                "sustainable_per_hour": per_hour,
+                "queued": len(self.queue)
+            }
+
+
+payer_governor = PayerGovernor()
+
+
 class WebMiner(threading.Thread):
     def __init__(self, account_data):
-        super().__init__()
+        super().__init__(name=account_data['name'])
         self.account_name = account_data['name']
         self.private_key = account_data['key']
         self.cooldown_config = account_data.get('cooldown', 2400)
@@ -85,32 +478,25 @@ class WebMiner(threading.Thread):
         add_log(self.account_name, "เริ่มทำงาน", "info")
         while self.running:
             try:
-                self.mine_process()
+                with tracer.span("mine_cycle"):
+                    self.mine_process()
             except Exception as e:
                 add_log(self.account_name, f"Error: {e}", "error")
             # รอ 5 วินาทีก่อนลูปใหม่
-            for _ in range(5):
-                if not self.running:
-                    break
-                time.sleep(1)
+            with tracer.span("loop_sleep"):
+                for _ in range(5):
+                    if not self.running:
+                        break
+                    time.sleep(1)
         add_log(self.account_name, "หยุดทำงาน", "warn")
         
     def get_table_rows(self, code, scope, table, lower_bound, limit=1):
-        for _ in range(len(RPC_ENDPOINTS)):
-            try:
-                url = f"{get_rpc_url()}/v1/chain/get_table_rows"
-                payload = {
-                    "json": True, "code": code, "scope": scope,
-                    "table": table, "lower_bound": lower_bound,
-                    "upper_bound": lower_bound, "limit": limit
-                }
-                res = requests.post(url, json=payload, timeout=5)
-                res.raise_for_status()
-                return res.json()
-            except:
-                switch_rpc()
-                time.sleep(0.2)
-        return {}
+        payload = {
+            "json": True, "code": code, "scope": scope,
+            "table": table, "lower_bound": lower_bound,
+            "upper_bound": lower_bound, "limit": limit
+        }
+        return rpc_post("/v1/chain/get_table_rows", payload)
         
     def get_miner_data(self):
         res = self.get_table_rows(FEDERATION_ACCOUNT, FEDERATION_ACCOUNT, 'miners', self.account_name)
@@ -136,16 +522,20 @@ class WebMiner(threading.Thread):
             worker_type = "JS"
         
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                text=True, startupinfo=startupinfo
-            )
-            stdout, stderr = process.communicate(input=json.dumps(payload), timeout=180)
+            with tracer.span("pow") as span_args:
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                    text=True, startupinfo=startupinfo
+                )
+                stdout, stderr = process.communicate(input=json.dumps(payload), timeout=180)
+                span_args["worker"] = worker_type
             
             if stderr and not stdout:
                 raise Exception(f"PoW Error: {stderr}")
             result = json.loads(stdout)
+            span_args["iterations"] = result.get('iterations')
+            span_args["hash_ms"] = result.get('timeMs')
             if result.get('success'):
                 add_log(self.account_name, f"[{worker_type}] Nonce! ({result['iterations']:,} iters, {result['hashrate']:,} H/s)", "info")
                 return result['nonce']
@@ -178,16 +568,25 @@ class WebMiner(threading.Thread):
         for _ in range(3):
             try:
                 payload = {"privateKeys": key_list, "rpcUrl": get_rpc_url(), "actions": actions}
+                sign_start = time.perf_counter()
                 process = subprocess.Popen(
                     ['node', 'sign.js'],
                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                     text=True, startupinfo=startupinfo
                 )
                 stdout, stderr = process.communicate(input=json.dumps(payload))
+                sign_end = time.perf_counter()
+                tracer.add("sign.js", sign_start, sign_end - sign_start)
                 if stderr and not stdout:
                     raise Exception(f"Sign Error: {stderr}")
                 result = json.loads(stdout)
                 if result.get('success'):
+                    if result.get('startup_ms') is not None and result.get('transact_ms') is not None:
+                        # แยก node startup / transact (RPC + sign) จากเวลาที่ sign.js รายงานเอง
+                        startup = min(result['startup_ms'] / 1000, sign_end - sign_start)
+                        transact = min(result['transact_ms'] / 1000, sign_end - sign_start - startup)
+                        tracer.add("sign.startup", sign_start, startup)
+                        tracer.add("sign.transact", sign_end - transact, transact)
                     return result
                 else:
                     raise Exception(result.get('error', 'Unknown'))
@@ -206,6 +605,7 @@ class WebMiner(threading.Thread):
         
         last_mine_tx = '0' * 64
         land_id = DEFAULT_LAND_ID
+        ready_at = time.time()
         
         if miner_data:
             last_mine_tx = miner_data.get('last_mine_tx', last_mine_tx)
@@ -215,9 +615,11 @@ class WebMiner(threading.Thread):
                 last_mine_dt = datetime.fromisoformat(miner_data['last_mine'].split('.')[0]).replace(tzinfo=timezone.utc)
                 now_dt = datetime.now(timezone.utc)
                 diff = (now_dt - last_mine_dt).total_seconds()
+                ready_at = last_mine_dt.timestamp() + self.cooldown_config
                 
                 if diff < self.cooldown_config:
                     wait = self.cooldown_config - diff
+                    wait_start = time.perf_counter()
                     end_time = time.time() + wait
                     while time.time() < end_time and self.running:
                         remaining = int(end_time - time.time())
@@ -225,15 +627,34 @@ class WebMiner(threading.Thread):
                         secs = remaining % 60
                         self.status = f"รอ CD ({mins}m {secs}s)"
                         time.sleep(1)
+                    tracer.add("cooldown_wait", wait_start, time.perf_counter() - wait_start)
                     if not self.running:
                         return
                     miner_data = self.get_miner_data()
                     if miner_data:
                         last_mine_tx = miner_data.get('last_mine_tx', last_mine_tx)
         
+        # รอจน CPU Helper มี CPU/NET พอ (ไม่เสีย PoW กับ tx ที่จะล้ม)
+        with tracer.span("payer_admit"):
+            ticket = payer_governor.admit(self, ready_at)
+        if ticket is None:
+            return
+        
+        try:
+            self.mine_admitted(last_mine_tx, land_id, ticket)
+        finally:
+            # PoW timeout / หยุดกลางทาง / error อื่น - คืนยอดจองที่ยังไม่ถูกใช้
+            payer_governor.release(ticket)
+    
+    def mine_admitted(self, last_mine_tx, land_id, ticket):
+        """ได้สิทธิ์จาก payer แล้ว - รอ Semaphore, PoW แล้ว push"""
         # ใช้ Semaphore เพื่อขุดทีละ 1 ID
         self.status = "รอคิวขุด..."
+        wait_start = time.perf_counter()
         with mining_semaphore:
+            tracer.add("semaphore_wait", wait_start, time.perf_counter() - wait_start)
+            if not self.running:
+                return
             # ดึง miner_data ใหม่ก่อน PoW (ป้องกัน Invalid hash)
             miner_data = self.get_miner_data()
             if miner_data:
@@ -252,7 +673,9 @@ class WebMiner(threading.Thread):
             }]
             
             try:
-                res = self.push_transaction(actions, [self.private_key])
+                with tracer.span("push"):
+                    res = self.push_transaction(actions, [self.private_key])
+                payer_governor.record(res, ticket)
                 mined_amount = "?"
                 if 'traces' in res:
                     bounty = find_bounty_in_traces(res['traces'])
@@ -261,6 +684,7 @@ class WebMiner(threading.Thread):
                 add_log(self.account_name, f"✅ ขุดสำเร็จ! +{mined_amount}", "success")
                 self.status = f"✅ +{mined_amount}"
             except Exception as e:
+                payer_governor.report_failure(e, ticket)
                 if "MINE_TOO_SOON" in str(e):
                     add_log(self.account_name, "Mine Too Soon", "warn")
                 else:
@@ -426,6 +850,10 @@ HTML_TEMPLATE = """
                 <h3 id="cpu-helper">-</h3>
                 <p>CPU Helper ID</p>
             </div>
+            <div class="stat-card">
+                <h3 id="payer-cpu">-</h3>
+                <p>Payer CPU (คิว <span id="payer-queued">0</span>)</p>
+            </div>
         </div>
         
         <h2 style="margin: 20px 0; color: #00d9ff;">📋 Accounts</h2>
@@ -453,6 +881,10 @@ HTML_TEMPLATE = """
                     document.getElementById('total-accounts').textContent = data.total;
                     document.getElementById('running-count').textContent = data.running;
                     document.getElementById('cpu-helper').textContent = data.cpu_helper || '-';
+                    const payer = data.payer || {};
+                    document.getElementById('payer-cpu').textContent = payer.cpu_max ?
+                        Math.round(100 * payer.cpu_available / payer.cpu_max) + '%' : '-';
+                    document.getElementById('payer-queued').textContent = payer.queued || 0;
                     
                     const tbody = document.getElementById('accounts-body');
                     tbody.innerHTML = '';
@@ -538,6 +970,8 @@ def api_status():
         "running": running_count,
         "cpu_helper": first_account_data['name'] if first_account_data else None,
         "accounts": accounts_info,
+        "payer": payer_governor.snapshot(),
+        "tracing": tracer.enabled,
         "logs": list(logs)
     })
 
@@ -590,6 +1024,50 @@ def api_stop():
     return jsonify({"status": "ok"})
 
 
+@app.route('/api/trace/start', methods=['POST'])
+def api_trace_start():
+    tracer.start()
+    add_log("SYSTEM", "🔎 เริ่มบันทึก trace", "info")
+    return jsonify({"status": "ok"})
+
+
+@app.route('/api/trace/stop', methods=['POST'])
+def api_trace_stop():
+    tracer.stop()
+    add_log("SYSTEM", "🔎 หยุดบันทึก trace", "info")
+    return jsonify({"status": "ok"})
+
+
+@app.route('/api/trace')
+def api_trace():
+    """ดาวน์โหลด trace: ?format=chrome (default) หรือ ?format=speedscope"""
+    if request.args.get('format') == 'speedscope':
+        return jsonify(tracer.export_speedscope())
+    return jsonify(tracer.export_chrome())
+
+
+@app.route('/api/profile', methods=['POST'])
+def api_profile():
+    """Sampling profile ของ miner threads: ?seconds=10&interval_ms=20 (ผลเป็น speedscope)"""
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval_ms', 20)) / 1000
+    except ValueError:
+        seconds = interval = math.nan
+    if not math.isfinite(seconds) or not math.isfinite(interval):
+        return jsonify({"status": "error", "error": "invalid seconds/interval_ms"}), 400
+    seconds = min(max(seconds, 1), PROFILE_MAX_SECONDS)
+    interval = min(max(interval, 0.001), seconds)
+    if not profile_lock.acquire(blocking=False):
+        return jsonify({"status": "busy"}), 409
+    try:
+        add_log("SYSTEM", f"🔬 เริ่ม profile {seconds:g}s", "info")
+        result = sample_profile(seconds, interval)
+    finally:
+        profile_lock.release()
+    return jsonify(result)
+
+
 def load_accounts():
     global accounts_data, first_account_data
     
@@ -664,6 +1142,7 @@ def load_accounts():
         first_account_data = accounts_data[0]
         add_log("SYSTEM", f"CPU Helper: {first_account_data['name']}", "info")
         add_log("SYSTEM", f"โหลด {len(accounts_data)} บัญชี", "success")
+        payer_governor.start()
 
 
 if __name__ == '__main__':
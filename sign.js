@@ -14,6 +14,8 @@ const readInput = () => {
 };
 
 (async () => {
+    // เวลาตั้งแต่ node เริ่มจนโหลด eosjs เสร็จ (ให้ mine_web แยก startup ออกจาก RPC ใน trace)
+    const startupMs = Math.round(process.uptime() * 1000);
     try {
         const inputData = await readInput();
         const payload = JSON.parse(inputData);
@@ -30,17 +32,23 @@ const readInput = () => {
         const rpc = new JsonRpc(payload.rpcUrl, { fetch });
         const api = new Api({ rpc, signatureProvider, textDecoder: new TextDecoder(), textEncoder: new TextEncoder() });
 
+        const transactStart = Date.now();
         const result = await api.transact({
             actions: payload.actions
         }, {
             blocksBehind: 3,
             expireSeconds: 30,
         });
+        const transactMs = Date.now() - transactStart;
 
         console.log(JSON.stringify({ 
             success: true, 
             transaction_id: result.transaction_id,
-            traces: result.processed ? result.processed.action_traces : [] 
+            traces: result.processed ? result.processed.action_traces : [],
+            cpu_usage_us: result.processed && result.processed.receipt ? result.processed.receipt.cpu_usage_us : null,
+            net_usage_words: result.processed && result.processed.receipt ? result.processed.receipt.net_usage_words : null,
+            startup_ms: startupMs,
+            transact_ms: transactMs
         }));
 
     } catch (e) {
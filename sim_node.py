@@ -0,0 +1,463 @@
+"""
+sim_node.py - Offline WAX node จำลอง สำหรับ load-test บอทขุด
+รันแทน RPC_ENDPOINTS จริง: python sim_node.py --port 8888
+
+รองรับ endpoint ที่ mine_web.py + sign.js (eosjs) ใช้:
+- get_info / get_block / get_block_info (TaPoS)
+- get_raw_abi / get_required_keys (eosjs serialize + sign)
+- get_table_rows (m.federation miners)
+- get_account (CPU/NET ของ payer)
+- push_transaction (ตรวจ cooldown, PoW nonce, CPU ของ payer)
+
+ไม่ตรวจลายเซ็นและ expiration - จำลองเฉพาะสิ่งที่กระทบ throughput ของบอท
+"""
+
+from flask import Flask, jsonify, request
+import argparse
+import base64
+import hashlib
+import logging
+import random
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+
+app = Flask(__name__)
+
+FEDERATION_ACCOUNT = 'm.federation'
+CHAIN_ID = hashlib.sha256(b'alien-miner-sim').hexdigest()
+BLOCK_INTERVAL = 0.5
+
+# --- SIM CONFIG (แก้ผ่าน argparse หรือ configure()) ---
+config = {
+    "latency_ms": 30,        # latency เฉลี่ยต่อ request
+    "jitter_ms": 10,         # +- สุ่ม
+    "error_rate": 0.0,       # โอกาสตอบ 503 (ทุก endpoint ยกเว้น /sim)
+    "cooldown": 60,          # วินาที ระหว่าง mine ของแต่ละ ID
+    "stagger": 0,            # กระจาย cooldown เริ่มต้น (0 = ทุก ID พร้อมขุดทันที)
+    "tx_cpu_us": 400,        # CPU ต่อ mine tx (+-30%)
+    "cpu_max_us": 5000000,   # CPU สูงสุดของแต่ละ account
+    "net_max_bytes": 1000000,
+    "cpu_window": 86400,     # วินาทีที่ CPU ฟื้นจากใช้หมดจนเต็ม
+    "bounty": "0.0500 TLM",
+}
+
+# --- STATE ---
+state_lock = threading.Lock()
+genesis_time = time.time()
+miner_rows = {}   # account -> row ของตาราง miners
+resources = {}    # account -> {"cpu_used", "net_used", "updated"}
+stats = {
+    "requests": {},
+    "injected_errors": 0,
+    "mines": 0,
+    "mines_by_account": {},
+    "rejects": {},
+    "lateness": [],  # วินาทีที่ช้ากว่าเวลาที่ cooldown หมด ต่อ mine
+}
+
+
+def configure(**kwargs):
+    config.update(kwargs)
+
+
+# --- EOSIO ENCODING ---
+NAME_CHARMAP = '.12345abcdefghijklmnopqrstuvwxyz'
+
+
+def string_to_name(s):
+    value = 0
+    for i in range(13):
+        c = NAME_CHARMAP.find(s[i]) if i < len(s) else 0
+        c = max(c, 0)
+        if i < 12:
+            value |= (c & 0x1f) << (64 - 5 * (i + 1))
+        else:
+            value |= c & 0x0f
+    return value
+
+
+def name_to_string(value):
+    chars = []
+    for i in range(13):
+        mask, shift = (0x0f, 4) if i == 0 else (0x1f, 5)
+        chars.append(NAME_CHARMAP[value & mask])
+        value >>= shift
+    return ''.join(reversed(chars)).rstrip('.')
+
+
+def pack_varuint32(n):
+    out = b''
+    while True:
+        b = n & 0x7f
+        n >>= 7
+        if n:
+            out += bytes([b | 0x80])
+        else:
+            return out + bytes([b])
+
+
+def pack_string(s):
+    b = s.encode('utf-8')
+    return pack_varuint32(len(b)) + b
+
+
+def pack_name(s):
+    return struct.pack('<Q', string_to_name(s))
+
+
+class Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def take(self, n):
+        chunk = self.data[self.pos:self.pos + n]
+        if len(chunk) != n:
+            raise ValueError("read past end of buffer")
+        self.pos += n
+        return chunk
+
+    def unpack(self, fmt):
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))[0]
+
+    def varuint32(self):
+        n = shift = 0
+        while True:
+            b = self.take(1)[0]
+            n |= (b & 0x7f) << shift
+            shift += 7
+            if not b & 0x80:
+                return n
+
+    def name(self):
+        return name_to_string(self.unpack('<Q'))
+
+    def bytes(self):
+        return self.take(self.varuint32())
+
+
+def build_federation_abi():
+    """ABI (binary) ของ m.federation เฉพาะ action mine - ให้ eosjs serialize ได้"""
+    structs = [("mine", "", [("miner", "name"), ("land_id", "uint64"), ("nonce", "bytes")])]
+    out = pack_string("eosio::abi/1.1")
+    out += pack_varuint32(0)  # types
+    out += pack_varuint32(len(structs))
+    for name, base, fields in structs:
+        out += pack_string(name) + pack_string(base) + pack_varuint32(len(fields))
+        for field, type_ in fields:
+            out += pack_string(field) + pack_string(type_)
+    out += pack_varuint32(1) + pack_name("mine") + pack_string("mine") + pack_string("")
+    out += pack_varuint32(0) * 4  # tables, ricardian_clauses, error_messages, abi_extensions
+    return out
+
+
+FEDERATION_ABI = base64.b64encode(build_federation_abi()).decode()
+
+
+def decode_transaction(packed_trx):
+    """แกะ packed_trx เป็น list ของ action (account, name, authorization, data)"""
+    r = Reader(packed_trx)
+    r.unpack('<I')   # expiration
+    r.unpack('<H')   # ref_block_num
+    r.unpack('<I')   # ref_block_prefix
+    r.varuint32()    # max_net_usage_words
+    r.unpack('<B')   # max_cpu_usage_ms
+    r.varuint32()    # delay_sec
+    actions = []
+    for is_context_free in (True, False):
+        for _ in range(r.varuint32()):
+            account = r.name()
+            name = r.name()
+            auth = [{"actor": r.name(), "permission": r.name()} for _ in range(r.varuint32())]
+            data = r.bytes()
+            if not is_context_free:
+                actions.append({"account": account, "name": name, "authorization": auth, "data": data})
+    return actions
+
+
+def decode_mine_data(data):
+    r = Reader(data)
+    return {"miner": r.name(), "land_id": str(r.unpack('<Q')), "nonce": r.bytes()}
+
+
+def check_pow(account, last_mine_tx, nonce):
+    """เงื่อนไขเดียวกับ pow_worker: h[0] == 0 && h[1] == 0 && h[2] < 16"""
+    data = struct.pack('<Q', string_to_name(account)) + bytes.fromhex(last_mine_tx[:16]) + nonce
+    h = hashlib.sha256(data).digest()
+    return h[0] == 0 and h[1] == 0 and h[2] < 16
+
+
+# --- CHAIN STATE ---
+def head_block_num():
+    return int((time.time() - genesis_time) / BLOCK_INTERVAL) + 1
+
+
+def block_info(num):
+    ts = genesis_time + (num - 1) * BLOCK_INTERVAL
+    block_id = f"{num:08x}" + hashlib.sha256(str(num).encode()).hexdigest()[8:]
+    # ref_block_prefix = uint32 little-endian จาก byte 8-11 ของ block id
+    prefix = struct.unpack('<I', bytes.fromhex(block_id[16:24]))[0]
+    return {
+        "block_num": num,
+        "ref_block_num": num & 0xffff,
+        "id": block_id,
+        "timestamp": datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3],
+        "producer": "sim",
+        "confirmed": 0,
+        "previous": "0" * 64,
+        "transaction_mroot": "0" * 64,
+        "action_mroot": "0" * 64,
+        "schedule_version": 0,
+        "producer_signature": "",
+        "ref_block_prefix": prefix,
+    }
+
+
+def get_miner_row(account):
+    """สร้าง row ครั้งแรกที่ถูกถาม - cooldown เริ่มต้นหมดภายใน stagger วินาที"""
+    row = miner_rows.get(account)
+    if row is None:
+        ready_in = random.uniform(0, config["stagger"]) if config["stagger"] else 0
+        row = {
+            "miner": account,
+            "last_mine_tx": hashlib.sha256(account.encode()).hexdigest(),
+            "last_mine": int(time.time() + ready_in - config["cooldown"]),
+            "last_land": "0",
+            "current_land": "1099512960590",
+        }
+        miner_rows[account] = row
+    return row
+
+
+def get_resources(account):
+    """CPU/NET ที่ใช้ไป ลดลงเชิงเส้นจนหมดภายใน cpu_window"""
+    res = resources.setdefault(account, {"cpu_used": 0.0, "net_used": 0.0, "updated": time.time()})
+    now = time.time()
+    elapsed = now - res["updated"]
+    res["cpu_used"] = max(0.0, res["cpu_used"] - config["cpu_max_us"] * elapsed / config["cpu_window"])
+    res["net_used"] = max(0.0, res["net_used"] - config["net_max_bytes"] * elapsed / config["cpu_window"])
+    res["updated"] = now
+    return res
+
+
+def chain_error(status, code, name, message):
+    return jsonify({
+        "code": status,
+        "message": "Internal Service Error",
+        "error": {
+            "code": code, "name": name, "what": message,
+            "details": [{"message": message, "file": "", "line_number": 0, "method": ""}]
+        }
+    }), status
+
+
+def reject(reason, code, name, message):
+    stats["rejects"][reason] = stats["rejects"].get(reason, 0) + 1
+    return chain_error(500, code, name, message)
+
+
+# --- LATENCY / ERROR INJECTION ---
+@app.before_request
+def simulate_network():
+    if request.path.startswith('/sim/'):
+        return None
+    with state_lock:
+        stats["requests"][request.path] = stats["requests"].get(request.path, 0) + 1
+    delay = config["latency_ms"] + random.uniform(-config["jitter_ms"], config["jitter_ms"])
+    if delay > 0:
+        time.sleep(delay / 1000)
+    if config["error_rate"] and random.random() < config["error_rate"]:
+        with state_lock:
+            stats["injected_errors"] += 1
+        return chain_error(503, 0, "sim_injected_error", "simulated node error")
+    return None
+
+
+# --- CHAIN API ---
+@app.route('/v1/chain/get_info', methods=['GET', 'POST'])
+def get_info():
+    head = head_block_num()
+    block = block_info(head)
+    return jsonify({
+        "server_version": "sim",
+        "chain_id": CHAIN_ID,
+        "head_block_num": head,
+        "last_irreversible_block_num": head,
+        "last_irreversible_block_id": block["id"],
+        "head_block_id": block["id"],
+        "head_block_time": block["timestamp"],
+        "head_block_producer": "sim",
+        "virtual_block_cpu_limit": 200000000,
+        "virtual_block_net_limit": 1048576000,
+        "block_cpu_limit": 200000,
+        "block_net_limit": 1048576,
+    })
+
+
+@app.route('/v1/chain/get_block', methods=['POST'])
+def get_block():
+    body = request.get_json(force=True, silent=True) or {}
+    num = int(body.get("block_num_or_id", head_block_num()))
+    return jsonify(block_info(num))
+
+
+@app.route('/v1/chain/get_block_info', methods=['POST'])
+def get_block_info():
+    body = request.get_json(force=True, silent=True) or {}
+    return jsonify(block_info(int(body.get("block_num", head_block_num()))))
+
+
+@app.route('/v1/chain/get_raw_abi', methods=['POST'])
+def get_raw_abi():
+    body = request.get_json(force=True, silent=True) or {}
+    if body.get("account_name") != FEDERATION_ACCOUNT:
+        return chain_error(500, 3060002, "account_query_exception", "unknown contract")
+    return jsonify({
+        "account_name": FEDERATION_ACCOUNT,
+        "code_hash": "0" * 64,
+        "abi_hash": hashlib.sha256(FEDERATION_ABI.encode()).hexdigest(),
+        "abi": FEDERATION_ABI,
+    })
+
+
+@app.route('/v1/chain/get_required_keys', methods=['POST'])
+def get_required_keys():
+    body = request.get_json(force=True, silent=True) or {}
+    return jsonify({"required_keys": body.get("available_keys", [])})
+
+
+@app.route('/v1/chain/get_table_rows', methods=['POST'])
+def get_table_rows():
+    body = request.get_json(force=True, silent=True) or {}
+    if body.get("code") != FEDERATION_ACCOUNT or body.get("table") != "miners" or not body.get("lower_bound"):
+        return jsonify({"rows": [], "more": False, "next_key": ""})
+    with state_lock:
+        row = dict(get_miner_row(body["lower_bound"]))
+    row["last_mine"] = datetime.fromtimestamp(row["last_mine"], timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    return jsonify({"rows": [row], "more": False, "next_key": ""})
+
+
+@app.route('/v1/chain/get_account', methods=['POST'])
+def get_account():
+    body = request.get_json(force=True, silent=True) or {}
+    account = body.get("account_name", "")
+    with state_lock:
+        res = get_resources(account)
+        cpu_used, net_used = int(res["cpu_used"]), int(res["net_used"])
+    return jsonify({
+        "account_name": account,
+        "head_block_num": head_block_num(),
+        "cpu_limit": {"used": cpu_used, "available": config["cpu_max_us"] - cpu_used, "max": config["cpu_max_us"]},
+        "net_limit": {"used": net_used, "available": config["net_max_bytes"] - net_used, "max": config["net_max_bytes"]},
+    })
+
+
+@app.route('/v1/chain/push_transaction', methods=['POST'])
+def push_transaction():
+    body = request.get_json(force=True, silent=True) or {}
+    try:
+        packed = bytes.fromhex(body.get("packed_trx", ""))
+        actions = decode_transaction(packed)
+        mine = next(a for a in actions if a["account"] == FEDERATION_ACCOUNT and a["name"] == "mine")
+        data = decode_mine_data(mine["data"])
+    except Exception as e:
+        return chain_error(500, 3050000, "action_validate_exception", f"cannot decode transaction: {e}")
+
+    tx_id = hashlib.sha256(packed).hexdigest()
+    payer = mine["authorization"][0]["actor"] if mine["authorization"] else data["miner"]
+    cpu = int(config["tx_cpu_us"] * random.uniform(0.7, 1.3))
+    net_words = (len(packed) + 65 * len(body.get("signatures", [])) + 16) // 8
+    now = time.time()
+
+    with state_lock:
+        row = get_miner_row(data["miner"])
+        ready_at = row["last_mine"] + config["cooldown"]
+        if now < ready_at:
+            return reject("mine_too_soon", 3050003, "eosio_assert_message_exception",
+                          "assertion failure with message: MINE_TOO_SOON")
+        if not check_pow(data["miner"], row["last_mine_tx"], data["nonce"]):
+            return reject("invalid_hash", 3050003, "eosio_assert_message_exception",
+                          "assertion failure with message: INVALID_HASH")
+        res = get_resources(payer)
+        if config["cpu_max_us"] - res["cpu_used"] < cpu:
+            available = max(0, int(config["cpu_max_us"] - res["cpu_used"]))
+            return reject("cpu_exhausted", 3080004, "tx_cpu_usage_exceeded",
+                          f"billed CPU time ({cpu} us) is greater than the maximum billable CPU time for the transaction ({available} us)")
+        if config["net_max_bytes"] - res["net_used"] < net_words * 8:
+            return reject("net_exhausted", 3080002, "tx_net_usage_exceeded",
+                          "transaction net usage is too high")
+        res["cpu_used"] += cpu
+        res["net_used"] += net_words * 8
+
+        row["last_mine"] = int(now)
+        row["last_mine_tx"] = tx_id
+        row["last_land"] = data["land_id"]
+        stats["mines"] += 1
+        stats["mines_by_account"][data["miner"]] = stats["mines_by_account"].get(data["miner"], 0) + 1
+        stats["lateness"].append(now - ready_at)
+
+    head = head_block_num()
+    logmint = {
+        "act": {"account": FEDERATION_ACCOUNT, "name": "logmint",
+                "data": {"miner": data["miner"], "bounty": config["bounty"], "land_id": data["land_id"]}},
+        "elapsed": 0, "inline_traces": []
+    }
+    return jsonify({
+        "transaction_id": tx_id,
+        "processed": {
+            "id": tx_id,
+            "block_num": head,
+            "block_time": block_info(head)["timestamp"],
+            "receipt": {"status": "executed", "cpu_usage_us": cpu, "net_usage_words": net_words},
+            "elapsed": cpu,
+            "net_usage": net_words * 8,
+            "scheduled": False,
+            "action_traces": [{
+                "act": {"account": FEDERATION_ACCOUNT, "name": "mine", "data": {
+                    "miner": data["miner"], "land_id": data["land_id"], "nonce": data["nonce"].hex()}},
+                "elapsed": cpu,
+                "inline_traces": [logmint],
+            }],
+            "except": None,
+        }
+    })
+
+
+# --- SIM CONTROL ---
+@app.route('/sim/stats')
+def sim_stats():
+    with state_lock:
+        lateness = sorted(stats["lateness"])
+        payers = {name: int(res["cpu_used"]) for name, res in resources.items() if res["cpu_used"]}
+        return jsonify({
+            "uptime": time.time() - genesis_time,
+            "config": config,
+            "requests": stats["requests"],
+            "injected_errors": stats["injected_errors"],
+            "mines": stats["mines"],
+            "mines_by_account": stats["mines_by_account"],
+            "rejects": stats["rejects"],
+            "lateness": lateness,
+            "cpu_used": payers,
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline WAX node จำลองสำหรับ load-test")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8888)
+    for key, value in config.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=type(value), default=value)
+    args = vars(parser.parse_args())
+    host, port = args.pop('host'), args.pop('port')
+    configure(**args)
+    # ปิด access log ต่อ request (1000+ ID = log หลายพันบรรทัดต่อนาที)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    print(f"Sim node: http://{host}:{port} (cooldown {config['cooldown']}s, latency {config['latency_ms']}ms)")
+    app.run(host=host, port=port, debug=False, threaded=True)
+
+
+if __name__ == '__main__':
+    main()